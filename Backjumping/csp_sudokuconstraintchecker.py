@@ -1,3 +1,33 @@
+import numpy as np
+
+# Mask with the bits of the digits 1 to 9 set, i.e. every candidate of an empty cell
+ALL_CANDIDATES = 0x3FE
+
+# First row (or column) of the 3x3 sub-square that contains each row (or column)
+BOX_START = (0, 0, 0, 3, 3, 3, 6, 6, 6)
+
+# Top-left (row, column) of each of the nine 3x3 sub-squares, in the order of BOX_IDX
+BOX_STARTS = tuple((row, column) for row in (0, 3, 6) for column in (0, 3, 6))
+
+# Index of the 3x3 sub-square (0-8, left to right and top to bottom) that contains each (row, column)
+BOX_IDX = tuple(tuple(BOX_START[row] + BOX_START[column] // 3 for column in range(9)) for row in range(9))
+
+# The 20 peers (cells sharing a row, column or 3x3 sub-square) of each (row, column), in row-major order
+PEERS = np.array([
+    [sorted(({(row, x) for x in range(9)} |
+             {(x, column) for x in range(9)} |
+             {(BOX_START[row] + x, BOX_START[column] + y) for x in range(3) for y in range(3)}) - {(row, column)})
+     for column in range(9)]
+    for row in range(9)
+], dtype=np.int8)
+
+# The same peers linearized as `row * 9 + column`, indexed by the linearized position of each cell
+PEER_FLAT = (PEERS[..., 0].astype(np.intp) * 9 + PEERS[..., 1]).reshape(81, 20)
+
+# The bit of each linearized position `row * 9 + column` in a conflict mask
+CELL_BIT = tuple(1 << cell for cell in range(81))
+
+
 class CSP_SudokuConstraintChecker:
     """
     A class to check constraints on a Sudoku board using the CSP (Constraint Satisfaction Problem) approach.
@@ -13,6 +43,10 @@ class CSP_SudokuConstraintChecker:
         An instance of a constraint-solving approach that is used to solve the board.
     verbose : bool, optional
         A flag that controls whether to print detailed logs during the solving process. Default is False.
+    row_mask, col_mask, box_mask : list of int
+        One 9-bit mask per row, column and 3x3 sub-square; bit `num` is set when `num` is placed in that unit.
+    empty_coords : list of tuple of int
+        The coordinates (row, column) of the empty cells of the initial board, in row-major order.
 
     Methods
     -------
@@ -22,16 +56,24 @@ class CSP_SudokuConstraintChecker:
         Checks if the 3x3 sub-square starting at the specified (row, column) is valid.
     check_line(line):
         Checks if a row, column, or 3x3 sub-square contains no duplicate values.
-    check_axes(board_state, axis, axis_index, num):
-        Checks if the number `num` is valid in the specified row or column.
-    check_ifUsed(board_state, row, column, num):
+    assign(row, column, num):
+        Records `num` as placed at (row, column) in the row, column and sub-square masks.
+    try_assign(row, column, num):
+        Records `num` at (row, column) only if it is valid there, returning whether it was placed.
+    undo_assign(row, column, num):
+        Removes `num` placed at (row, column) from the row, column and sub-square masks.
+    candidates(row, column):
+        Returns the 9-bit mask of the numbers that can still be placed at (row, column).
+    check_ifUsed(row, column, num):
         Checks if a number is already used in the 3x3 sub-square that contains the specified (row, column).
     check_done(board_state):
         Checks if the Sudoku board is completely solved.
-    check_coords(arr, row, column, num):
+    check_coords(row, column, num):
         Verifies if a number can be placed at a specific position on the Sudoku board.
     check_conflicts(board_state, row, column, num):
         Identifies conflicts in the board when placing a number at the specified position.
+    check_peerConflicts(board_state, row, column):
+        Identifies the conflicts of all the numbers that cannot be placed at the specified position.
     """
     def __init__(self, board_state, constraint_approach, verbose=False):
         """
@@ -51,30 +93,112 @@ class CSP_SudokuConstraintChecker:
         self.board_state = board_state
         self.constraint_approach = constraint_approach
 
+        # Build the row, column and sub-square masks from the cells already filled in,
+        # and collect the coordinates of the empty cells that have to be solved
+        self.row_mask = [0] * 9
+        self.col_mask = [0] * 9
+        self.box_mask = [0] * 9
+        self.empty_coords = []
+        for row in range(9):
+            for column in range(9):
+                num = int(board_state[row][column])
+                if num:
+                    self.assign(row, column, num)
+                else:
+                    self.empty_coords.append((row, column))
+
     def solver(self):
         """
         Initiates the solving process for the current Sudoku board.
 
-        This method generates a list of coordinates for empty cells (cells with value 0) 
-        on the board and then calls the constraint-solving method to attempt filling in 
-        the Sudoku grid according to the constraints.
+        This method calls the constraint-solving method to attempt filling in the empty
+        cells listed in `empty_coords` according to the constraints.
 
         Returns
         -------
         list
             A list representing the solved Sudoku board or an empty list if no solution is found.
         """
-        # Generate coordinates for all empty cells in the 9x9 Sudoku grid
-        coords = [(x, y) for x in range(9) for y in range(9) if self.board_state[x][y] == 0]
-        
         # Calls the constraint-based solver with the current board state
         return self.constraint_approach.solver(self)
 
+    def assign(self, row, column, num):
+        """
+        Records a number as placed at a specific position on the Sudoku board.
+
+        The bit `num` is set in the masks of the row, column and 3x3 sub-square that contain
+        the position. Setting rather than toggling keeps the bit when the same number is
+        recorded twice in a unit, e.g. by duplicated clues, so it is never freed by mistake.
+
+        Parameters
+        ----------
+        row : int
+            The row index where the number is placed.
+        column : int
+            The column index where the number is placed.
+        num : int
+            The number placed at the specified position.
+        """
+        bit = 1 << num
+        self.row_mask[row] |= bit
+        self.col_mask[column] |= bit
+        self.box_mask[BOX_IDX[row][column]] |= bit
+
+    def try_assign(self, row, column, num):
+        """
+        Places a number at a specific position on the Sudoku board if it is valid there.
+
+        This function fuses `check_coords` and `assign`: the combined row, column and 3x3
+        sub-square mask is tested once and, if `num` is free, its bit is set in the three
+        masks in the same pass. A successful placement is reverted with `undo_assign`.
+
+        Parameters
+        ----------
+        row : int
+            The row index where the number is to be placed.
+        column : int
+            The column index where the number is to be placed.
+        num : int
+            The number to be placed.
+
+        Returns
+        -------
+        bool
+            True if the number was placed, False if it is already used in the row, column or sub-square.
+        """
+        bit = 1 << num
+        box = BOX_IDX[row][column]
+        if (self.row_mask[row] | self.col_mask[column] | self.box_mask[box]) & bit:
+            return False
+
+        self.row_mask[row] |= bit
+        self.col_mask[column] |= bit
+        self.box_mask[box] |= bit
+        return True
+
+    def undo_assign(self, row, column, num):
+        """
+        Removes a number previously placed with `assign` or `try_assign` from a specific position.
+
+        Parameters
+        ----------
+        row : int
+            The row index where the number was placed.
+        column : int
+            The column index where the number was placed.
+        num : int
+            The number to be removed from the specified position.
+        """
+        bit = 1 << num
+        self.row_mask[row] ^= bit
+        self.col_mask[column] ^= bit
+        self.box_mask[BOX_IDX[row][column]] ^= bit
+
     def check_subSquare(self, row, column, board_state):
         """
         Checks if a 3x3 sub-square in the Sudoku board is valid.
 
-        This function extracts a 3x3 sub-square from the Sudoku board starting at the specified 
+        This function slices a 3x3 sub-square from the Sudoku board starting at the specified 
         row and column coordinates. It then checks if the values within this sub-square follow 
         the Sudoku rules, ensuring no repeated numbers from 1 to 9.
 
@@ -84,17 +208,17 @@ class CSP_SudokuConstraintChecker:
             The starting row index for the 3x3 sub-square.
         column : int
             The starting column index for the 3x3 sub-square.
-        board_state : list of list of int
-            The current state of the Sudoku board, represented as a 2D list or array.
+        board_state : np.ndarray
+            The current state of the Sudoku board, represented as a 2D NumPy array.
 
         Returns
         -------
         bool
             True if the 3x3 sub-square follows Sudoku rules (no duplicates), False otherwise.
         """
-        # Extract the 3x3 sub-square values starting from (row, column)
-        sub_square = [board_state[(row + x), (column + y)] for x in range(3) for y in range(3)]
-        
+        # Slice the 3x3 sub-square starting from (row, column) and flatten it into a line
+        sub_square = board_state[row:row + 3, column:column + 3].ravel()
+
         # Check if the extracted 3x3 square is valid using checkLine
         return self.check_line(sub_square)
 
@@ -104,66 +228,67 @@ class CSP_SudokuConstraintChecker:
         Checks if a line (row, column, or sub-square) in the Sudoku board is valid.
 
         This function verifies that there are no duplicate numbers in the provided line,
-        ignoring zeros (which represent empty cells). It uses a set to ensure that
-        the unique numbers (excluding zeros) match the count of non-zero entries in the line.
+        ignoring zeros (which represent empty cells). Each non-zero value is folded into a
+        9-bit integer mask; a value whose bit is already set is a duplicate. NumPy lines are
+        instead counted with `np.bincount` in a single pass.
 
         Parameters
         ----------
-        line : list of int
-            A list representing a row, column, or 3x3 sub-square from the Sudoku board.
+        line : list of int or np.ndarray
+            A row, column, or 3x3 sub-square from the Sudoku board.
 
         Returns
         -------
         bool
             True if the line has no duplicates among the non-zero entries, False otherwise.
         """
-        # Convert line to a set, excluding zeros, and check if its length matches non-zero count in line
-        return len(set(line) - {0}) == len(line) - line.count(0)
-
-
-    def check_axes(self, board_state, axis, axis_index, num):
+        # Count every value of a NumPy line at once; no digit may appear more than once
+        if isinstance(line, np.ndarray):
+            return bool(np.bincount(line, minlength=10)[1:].max() <= 1)
+
+        # Fold the non-zero values into a bitmask, stopping at the first repeated bit
+        mask = 0
+        for value in line:
+            if value:
+                bit = 1 << int(value)
+                if mask & bit:
+                    return False
+                mask |= bit
+        return True
+
+
+    def candidates(self, row, column):
         """
-        Checks if a given number is valid within a specified row or column of the Sudoku board.
+        Computes the candidate numbers of a specific position on the Sudoku board.
 
-        This function determines if `num` already exists in the specified row or column,
-        which is crucial for maintaining Sudoku's constraint of unique numbers in each row and column.
+        The candidates are derived from the row, column and 3x3 sub-square masks rather than
+        stored per cell, so they stay exact when `undo_assign` reverts a placement.
 
         Parameters
         ----------
-        board_state : list of lists of int
-            Current state of the Sudoku board as a 2D list.
-        axis : int
-            Indicates which axis to check (0 for row, 1 for column).
-        axis_index : int
-            The index of the row or column to be checked.
-        num : int
-            The number to check for validity in the specified row or column.
+        row : int
+            The row index of the position.
+        column : int
+            The column index of the position.
 
         Returns
         -------
-        bool
-            True if `num` is already present in the specified row or column, False otherwise.
+        int
+            A mask with bit `num` set for every number not used yet in the row, column or sub-square.
         """
-        # Verbose output if enabled, indicating the number and axis being checked
-        if self.verbose:
-            print(f"Checking if {num} is valid in {'row' if axis == 0 else 'column'} {axis_index}")
+        return ~(self.row_mask[row] | self.col_mask[column] | self.box_mask[BOX_IDX[row][column]]) & ALL_CANDIDATES
 
-        # Check each element in the specified row or column for the presence of `num`
-        return any(board_state[axis_index][x] == num if axis == 0 else board_state[x][axis_index] == num for x in range(9))
 
-
-    def check_ifUsed(self, board_state, row, column, num):
+    def check_ifUsed(self, row, column, num):
         """
         Checks if a specified number already exists within a 3x3 sub-square of the Sudoku board.
 
         This function ensures that `num` is not duplicated within a 3x3 sub-square,
-        as per Sudoku rules, by examining each cell in the sub-square that contains
+        as per Sudoku rules, by testing the mask of the sub-square that contains
         the cell located at the given `row` and `column`.
 
         Parameters
         ----------
-        board_state : list of lists of int
-            Current state of the Sudoku board as a 2D list.
         row : int
             The starting row index of the 3x3 sub-square.
         column : int
@@ -176,8 +301,8 @@ class CSP_SudokuConstraintChecker:
         bool
             True if `num` is found within the specified 3x3 sub-square, False otherwise.
         """
-        # Check each cell in the 3x3 sub-square for the presence of `num`
-        return any(board_state[x + row][y + column] == num for x in range(3) for y in range(3))
+        # Test the bit of `num` in the mask of the 3x3 sub-square
+        return bool((self.box_mask[BOX_IDX[row][column]] >> num) & 1)
 
 
     def check_done(self, board_state):
@@ -190,6 +315,10 @@ class CSP_SudokuConstraintChecker:
         - All 3x3 sub-squares are valid (no duplicates).
         - There are no empty cells (represented by 0).
 
+        Empty cells are detected on the given board with a single `all()` test. Each group is
+        then sorted with NumPy and compared against the digits 1 to 9, so every row, column and
+        sub-square is checked in a single vectorized operation.
+
         Parameters
         ----------
         board_state : list of lists of int
@@ -200,17 +329,25 @@ class CSP_SudokuConstraintChecker:
         bool
             True if the board is completely solved (all rows, columns, and sub-squares are valid, and there are no empty cells), False otherwise.
         """
-        # Check that all rows, columns, and sub-squares are valid, and there are no empty cells
-        axis_index = 1
-        return all(
-            self.check_line(board_state[axis_index, :]) and  # Validate each row
-            self.check_line(board_state[:, axis_index]) and  # Validate each column
-            self.check_subSquare(int(x / 3) * 3, (x % 3) * 3, board_state)  # Validate each 3x3 sub-square
-            for x in range(9)
-        ) and 0 not in board_state  # Ensure there are no empty cells in the board (0)
+        board_state = np.asarray(board_state)
+
+        # Ensure there are no empty cells left to fill in
+        if not board_state.all():
+            return False
+
+        # Rearrange the board so that each row holds one 3x3 sub-square
+        sub_squares = board_state.reshape(3, 3, 3, 3).swapaxes(1, 2).reshape(9, 9)
+        digits = np.arange(1, 10)
+
+        # Check that all rows, columns, and sub-squares contain the digits 1 to 9
+        return bool(
+            np.all(np.sort(board_state, axis=1) == digits) and  # Validate each row
+            np.all(np.sort(board_state, axis=0) == digits[:, None]) and  # Validate each column
+            np.all(np.sort(sub_squares, axis=1) == digits)  # Validate each 3x3 sub-square
+        )
 
 
-    def check_coords(self, arr, row, column, num):
+    def check_coords(self, row, column, num):
         """
         Checks if a number can be placed in a specific position on the Sudoku board.
 
@@ -221,8 +358,6 @@ class CSP_SudokuConstraintChecker:
 
         Parameters
         ----------
-        arr : list of lists of int
-            The current state of the Sudoku board as a 2D list.
         row : int
             The row index where the number is to be placed.
         column : int
@@ -237,10 +372,8 @@ class CSP_SudokuConstraintChecker:
             False otherwise.
         """
         # Check that the number is not already used in the 3x3 sub-square
-        # and not in the same row or column.
-        return not self.check_ifUsed(arr, row - row % 3, column - column % 3, num) and \
-               not self.check_axes(arr, 0, row, num) and \
-               not self.check_axes(arr, 1, column, num)
+        # and not in the same row or column, i.e. that it is still a candidate.
+        return bool((self.candidates(row, column) >> num) & 1)
 
 
     def check_conflicts(self, board_state, row, column, num):
@@ -248,12 +381,15 @@ class CSP_SudokuConstraintChecker:
         Checks for conflicts in the Sudoku board when attempting to place a number at a specific position.
 
         This function identifies all the positions on the Sudoku board where the specified number already 
-        exists in the same row, column, or 3x3 sub-square, and returns those positions as a set of conflicts.
+        exists in the same row, column, or 3x3 sub-square, and returns those positions as a mask of conflicts.
+        Each position (row, column) is linearized as `row * 9 + column`, which is its bit in the mask.
+        The values of the 20 peers of the position are gathered from the flattened board through
+        `PEER_FLAT` in a single step.
 
         Parameters
         ----------
-        board_state : list of lists of int
-            The current state of the Sudoku board as a 2D list.
+        board_state : np.ndarray
+            The current state of the Sudoku board as a 2D NumPy array.
         row : int
             The row index where the number is to be placed.
         column : int
@@ -263,23 +399,45 @@ class CSP_SudokuConstraintChecker:
 
         Returns
         -------
-        set
-            A set containing the positions (row, column) where the number already exists, 
+        int
+            A mask with the bit of every linearized position where the number already exists, 
             including the row, column, and 3x3 sub-square.
         """
-        # Initialize an empty set to store conflicts.
-        conflict_set = {(row + (x * 8)) for x in range(9) if board_state[row][x] == num}
-        
-        # Add conflicts from the same column.
-        conflict_set.update((x + (column * 8)) for x in range(9) if board_state[x][column] == num)
+        # Start with the current position as a conflict.
+        conflict_mask = CELL_BIT[row * 9 + column]
 
-        # Identify the 3x3 sub-square where the position (row, column) belongs.
-        box_row, box_column = row - row % 3, column - column % 3
+        # Add the peers of (row, column) that already hold `num`.
+        peers = PEER_FLAT[row * 9 + column]
+        for peer in peers[board_state.ravel()[peers] == num].tolist():
+            conflict_mask |= CELL_BIT[peer]
 
-        # Add conflicts from the 3x3 sub-square.
-        conflict_set.update(x + box_row + (8 * (y + box_column)) for x in range(3) for y in range(3) if board_state[x + box_row][y + box_column] == num)
+        return conflict_mask
+
+    def check_peerConflicts(self, board_state, row, column):
+        """
+        Collects the conflicts of every number that cannot be placed at a specific position.
 
-        # Add the current position as a conflict.
-        conflict_set.add(row + (8 * column))
+        A number is ruled out at (row, column) exactly when one of its 20 peers holds it, so the
+        union of `check_conflicts` over all those numbers is the set of filled peers. It is gathered
+        from the flattened board through `PEER_FLAT` in a single step.
+
+        Parameters
+        ----------
+        board_state : np.ndarray
+            The current state of the Sudoku board as a 2D NumPy array.
+        row : int
+            The row index of the position.
+        column : int
+            The column index of the position.
+
+        Returns
+        -------
+        int
+            A mask with the bit of the linearized position of every peer of (row, column) that holds a number.
+        """
+        conflict_mask = 0
+        peers = PEER_FLAT[row * 9 + column]
+        for peer in peers[board_state.ravel()[peers] != 0].tolist():
+            conflict_mask |= CELL_BIT[peer]
 
-        return conflict_set
+        return conflict_mask
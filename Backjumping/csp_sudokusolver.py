@@ -1,5 +1,9 @@
-from csp_utils import CSP_utils
-from itertools import islice
+from csp_utils import print_board
+from csp_sudokuconstraintchecker import BOX_STARTS
+import numpy as np
+
+# Verbose label of a try result, indexed by the boolean result itself
+_RESULT_NAME = ('Failure', 'Success')
 
 class CSP_SudokuSolver:
     """
@@ -23,9 +27,9 @@ class CSP_SudokuSolver:
     -------
     solver(sudoku):
         Solves the Sudoku puzzle by calling the backjumping_algorithm method with the current state of the board.
-    backjumping_algorithm(sudoku, board_state, coords):
+    backjumping_algorithm(sudoku, board_state, coords, idx=0):
         Solves the puzzle using the backjumping technique, attempting to assign values to cells and handling conflicts.
-    try_value(sudoku, board_state, x, row_after, column_after, coords_after):
+    try_value(sudoku, board_state, x, row_after, column_after, coords, idx):
         Attempts to place a value in a specified cell and propagates the backjumping algorithm.
     """
 
@@ -63,18 +67,20 @@ class CSP_SudokuSolver:
             - A boolean indicating if the puzzle was solved (True or False).
             - The updated board state after attempting to solve.
         """
-        coords = [(x, y) for x in range(9) for y in range(9) if sudoku.board_state[x][y] == 0]
-        solved, board_state, _ = self.backjumping_algorithm(sudoku, sudoku.board_state, coords)
+        # The search mutates a single board, copy it once so the caller's puzzle is left untouched;
+        # the copy is a contiguous int8 array, so every flattened peer gather is a view
+        board_state = np.array(sudoku.board_state, dtype=np.int8)
+        solved, board_state, _ = self.backjumping_algorithm(sudoku, board_state, sudoku.empty_coords)
 
         if solved:
             print("\nSudoku solved:\n")
-            CSP_utils.print_board(board_state, self.verbose)
+            print_board(board_state)
         else:
             print("No solution found.")
         
         return solved, board_state
 
-    def backjumping_algorithm(self, sudoku, board_state, coords):
+    def backjumping_algorithm(self, sudoku, board_state, coords, idx=0):
         """
         Performs the Backjumping algorithm to try to fill the Sudoku board with valid numbers.
 
@@ -92,6 +98,8 @@ class CSP_SudokuSolver:
             The current state of the Sudoku board represented as a 2D list (0 for empty cells).
         coords : list of tuple of int
             A list of coordinates (row, column) representing the empty cells that need to be filled.
+        idx : int, optional
+            The position in `coords` of the next cell to fill; the cells before it are already assigned. Default is 0.
 
         Returns
         -------
@@ -99,52 +107,63 @@ class CSP_SudokuSolver:
             A tuple containing:
             - A boolean indicating if the puzzle was solved
             - The updated board state after that the algorithm was applying.
-            - A set of conflicts encountered during the solving process.
+            - A mask of the conflicts encountered during the solving process, with bit `row * 9 + column` set for each conflicting cell.
         """
         # Verbose detail level 1 (default)
         if self.verbose and self.verbose_level == 1:
             self.iteration_count += 1
             if self.iteration_count % self.iteration_level == 0:
-                print(f"[Iteration: {self.iteration_count}] Backjump called with coords: \n{coords}\n")
+                print(f"[Iteration: {self.iteration_count}] Backjump called with coords: \n{coords[idx:]}\n")
 
         # Base-case
-        if not coords:
-            return True, board_state, set()
+        if idx == len(coords):
+            return True, board_state, 0
+
+        row_after, column_after = coords[idx]
+        cell_bit = 1 << (row_after * 9 + column_after)
+
+        # Numbers held by a peer can't be placed here; their conflicts are exactly the filled peers
+        candidates = sudoku.candidates(row_after, column_after)
+        conflict_set = sudoku.check_peerConflicts(board_state, row_after, column_after)
+        result = False
+        x = 0  # stays 0 when the cell has no candidate to try
 
-        conflict_set = set()
-        row_after, column_after = coords[0]
-        coords_after = list(islice(coords, 1, None)) # coordinates remaining after current
+        # place each candidate number in the specified cell, popping the lowest set bit so only
+        # the allowed numbers are visited, in increasing order
+        while candidates:
+            low = candidates & -candidates
+            candidates ^= low
+            x = low.bit_length() - 1
 
-        # place each number from 1 to 9 in the specified cell   
-        for x in range(1, 10):
             # Calling of method try_value
-            result, update_puzzle, new_conflicts = self.try_value(sudoku, board_state, x, row_after, column_after, coords_after)
+            result, update_puzzle, new_conflicts = self.try_value(sudoku, board_state, x, row_after, column_after, coords, idx + 1)
 
             # Level 2 of verbose detail
             if self.verbose and self.verbose_level == 2 and self.iteration_count % self.iteration_level == 0:
                 if x % 3 == 0:
                     self.iteration_count += 1
-                    print(f"[Iteration: {self.iteration_count}]\nTrying value {x} at ({row_after}, {column_after}) - Result: {'Success' if result else 'Failure'}\n")
+                    print(f"[Iteration: {self.iteration_count}]\nTrying value {x} at ({row_after}, {column_after}) - Result: {_RESULT_NAME[result]}\n")
 
             if result:
-                return True, update_puzzle, set()
-            elif (row_after + (8 * column_after)) not in new_conflicts:
+                return True, update_puzzle, 0
+            elif not new_conflicts & cell_bit:
                 return False, board_state, new_conflicts
             else:
-                new_conflicts.remove(row_after + (8 * column_after))
-                conflict_set = conflict_set.union(new_conflicts)
-
-            board_state[row_after, column_after] = 0
+                conflict_set |= new_conflicts & ~cell_bit
 
         # Level 3 of verbose detail
         if self.verbose and self.verbose_level == 3 and conflict_set and self.iteration_count % self.iteration_level == 0:
             self.iteration_count += 1
-            print(f"[Iteration: {self.iteration_count}]\nTrying value {x} at ({row_after}, {column_after}) - Result: {'Success' if result else 'Failure'}\nConflicts at ({row_after}, {column_after}): whit value {x}\nTotal conflicts - {len(conflict_set)}\n")
+            if x:
+                print(f"[Iteration: {self.iteration_count}]\nTrying value {x} at ({row_after}, {column_after}) - Result: {_RESULT_NAME[result]}\nConflicts at ({row_after}, {column_after}): whit value {x}\nTotal conflicts - {conflict_set.bit_count()}\n")
+            else:
+                # Dead end without any candidate, there is no tried value to report
+                print(f"[Iteration: {self.iteration_count}]\nNo candidate values at ({row_after}, {column_after})\nTotal conflicts - {conflict_set.bit_count()}\n")
 
-        # If none of the values ​​from 1 to 9 were valid, we returned False with the conflicts found
+        # If none of the candidate values were valid, we returned False with the conflicts found
         return False, board_state, conflict_set
 
-    def try_value(self, sudoku, board_state, x, row_after, column_after, coords_after):
+    def try_value(self, sudoku, board_state, x, row_after, column_after, coords, idx):
         """
         Attempts to place a value in a specified cell on the Sudoku board and propagates the backjumping algorithm.
 
@@ -160,8 +179,10 @@ class CSP_SudokuSolver:
             The row index of the cell to place the value in.
         column_after : int
             The column index of the cell to place the value in.
-        coords_after : list of tuple of int
-            A list of remaining empty cell coordinates to process after placing the value.
+        coords : list of tuple of int
+            The list of all the empty cell coordinates of the search.
+        idx : int
+            The position in `coords` of the next cell to process after placing the value.
 
         Returns
         -------
@@ -169,12 +190,20 @@ class CSP_SudokuSolver:
             A tuple containing:
             - A boolean indicating if the value placement was successful (True or False).
             - The updated board state after attempting the placement.
-            - A set of conflicts encountered during the process.
+            - A mask of the conflicts encountered during the process, with bit `row * 9 + column` set for each conflicting cell.
         """
-        if sudoku.check_coords(board_state, row_after, column_after, x):
+        if sudoku.try_assign(row_after, column_after, x):
             board_state[row_after, column_after] = x
-            return self.backjumping_algorithm(sudoku, board_state.copy(), coords_after)
+            result = self.backjumping_algorithm(sudoku, board_state, coords, idx)
+
+            # The board is shared by the whole search, release the cell and its masks if the branch failed
+            if not result[0]:
+                sudoku.undo_assign(row_after, column_after, x)
+                board_state[row_after, column_after] = 0
+            return result
         else:
+            # Not reached from backjumping_algorithm, which only tries candidate values; kept so
+            # that trying an arbitrary value still reports the conflicts that rule it out
             return False, board_state, sudoku.check_conflicts(board_state, row_after, column_after, x)
    
 
@@ -195,42 +224,31 @@ class CSP_SudokuSolver:
         bool
             true if the board is valid, false if not.
         """
+        board_state = np.asarray(board_state)
+        digits = np.arange(1, 10)
+
+        # Sort every row, column and 3x3 sub-square at once, one group per row of each array
+        rows = np.sort(board_state, axis=1)
+        columns = np.sort(board_state.T, axis=1)
+        sub_squares = np.sort(board_state.reshape(3, 3, 3, 3).swapaxes(1, 2).reshape(9, 9), axis=1)
+
         # Verify rows
-        for row in range(9):
-            if not self.is_valid_group(board_state[row]):
-                print(f"Fila {row} no válida.")
-                return False
+        invalid = ~np.all(rows == digits, axis=1)
+        if invalid.any():
+            print(f"Fila {int(invalid.argmax())} no válida.")
+            return False
 
         # Verify columns
-        for col in range(9):
-            column = [board_state[row][col] for row in range(9)]
-            if not self.is_valid_group(column):
-                print(f"Columna {col} no válida.")
-                return False
+        invalid = ~np.all(columns == digits, axis=1)
+        if invalid.any():
+            print(f"Columna {int(invalid.argmax())} no válida.")
+            return False
 
         # Verificar subgrid 3x3
-        for box_row in range(0, 9, 3):
-            for box_col in range(0, 9, 3):
-                box = [board_state[row][col] for row in range(box_row, box_row + 3) for col in range(box_col, box_col + 3)]
-                if not self.is_valid_group(box):
-                    print(f"Subcuadro 3x3 en ({box_row}, {box_col}) no válido.")
-                    return False
+        invalid = ~np.all(sub_squares == digits, axis=1)
+        if invalid.any():
+            box_row, box_col = BOX_STARTS[int(invalid.argmax())]
+            print(f"Subcuadro 3x3 en ({box_row}, {box_col}) no válido.")
+            return False
 
         return True
-
-    def is_valid_group(self, group):
-        """
-        Checks if a group of elements (row, column or subbox) is valid,
-        that is, if it contains all the numbers from 1 to 9 without repeating itself.
-        
-        Parameters
-        ----------
-        group : list 
-            The list of numbers to check.
-        
-        Returns
-        -------
-        bool
-            True if the group is valid, False if not.
-        """
-        return sorted(group) == list(range(1, 10))
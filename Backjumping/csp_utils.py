@@ -1,87 +1,165 @@
-import argparse
-import os
+"""
+Helper functions for solving Sudoku using the backjumping algorithm.
+This includes functions for parsing command-line arguments, printing Sudoku boards,
+and displaying information about the solving process.
+"""
+import sys
+from collections import namedtuple
 
-class CSP_utils:
+# Parsed command-line arguments, in the order the options are declared in _ARG_SPECS
+_Args = namedtuple('_Args', 'verbose verbose_level iteration_level boardcode')
+
+# ArgumentParser shared by every call to parse_args, built on first use
+_PARSER = None
+
+# Help text of the '--verbose-level' option
+_VERBOSE_LEVEL_HELP = 'Verbosity level: \n1: simplified verbosity \n2: intermediate verbosity \n3: complete verbosity \n(1-3) [Default: 1]'
+
+# Command-line options of the solver, as the positional and keyword arguments of add_argument
+_ARG_SPECS = (
+    # Optional argument '--verbose' for toggle verbose
+    (('--verbose',), dict(action='store_true', help='Activate detailed output')),
+    # Argument '--verbose_level' for verbose level detail (1, 2, 3)
+    (('--verbose-level',), dict(type=int, default=1, help=_VERBOSE_LEVEL_HELP)),
+    # Argument '--iteration_level' that define the number of iteration
+    (('--iteration-level',), dict(type=int, default=10, help='Number of iterations between verbose outputs [Default: 10]')),
+    # Argument '--boardcode' to specify the name of the board-game
+    (('--boardcode',), dict(type=str, default='DG9TFMNR.txt', help='Sudoku board file name to solve [Default: DG9TFMNR.txt]')),
+)
+
+# Layout of a board row: one space between values and two after every third value
+_ROW_FMT = "{} {} {}  {} {} {}  {} {} {}  "
+
+# Line printed between the bands of three rows of 3x3 sub-squares
+_SEPARATOR = "               "
+
+# The whole rendered board, with a '0' placeholder at every cell, and the offsets of the 81 cells in it
+_BOARD_TEMPLATE = bytes(
+    "\n".join([_ROW_FMT] * 3 + [_SEPARATOR] + [_ROW_FMT] * 3 + [_SEPARATOR] + [_ROW_FMT] * 3).replace("{}", "0") + "\n",
+    "ascii",
+)
+_CELL_OFFSETS = tuple(offset for offset, char in enumerate(_BOARD_TEMPLATE) if char == ord("0"))
+
+
+def _build_parser():
+    """
+    Builds the parser of the command-line arguments of the Sudoku solver.
+
+    Returns
+    -------
+    argparse.ArgumentParser
+        The parser with all the solver options registered.
     """
-    Utility class containing helper methods for solving Sudoku using the backjumping algorithm.
-    This includes methods for parsing command-line arguments, printing Sudoku boards,
-    and displaying information about the solving process.
+    # Imported here so that printing helpers don't pay for argparse at import time
+    import argparse
+
+    # Create the object ArgumentParser for input parameters
+    # Options must be written in full, which spares argparse the prefix matching of abbreviations
+    parser = argparse.ArgumentParser(description="Expert level Sudoku solver using backjumping", allow_abbrev=False)
+
+    # Register every option of the solver
+    for flags, options in _ARG_SPECS:
+        parser.add_argument(*flags, **options)
+
+    return parser
+
+
+def parse_args():
     """
+    Parses command-line arguments to configure the Sudoku solver.
 
-    def parse_args():
-        """
-        Parses command-line arguments to configure the Sudoku solver.
-
-        Returns
-        -------
-        argparse.Namespace
-            The parsed arguments containing configuration parameters.
-        """
-        # Create the object ArgumentParser for input parameters
-        parser = argparse.ArgumentParser(description="Expert level Sudoku solver using backjumping")
-        
-        # Add an optional argument '--verbose' for toggle verbose
-        parser.add_argument('--verbose', action='store_true', help='Activate detailed output')
-        
-        # Add argument '--verbose_level' for verbose level detail (1, 2, 3)
-        parser.add_argument('--verbose-level', type=int, default=1, help='Verbosity level: \n1: simplified verbosity \n2: intermediate verbosity \n3: complete verbosity \n(1-3) [Default: 1]')
-        
-        # Add argument '--iteration_level' that define the number of iteration
-        parser.add_argument('--iteration-level', type=int, default=10, help='Number of iterations between verbose outputs [Default: 10]')
-        
-        # Add argument '--boardcode' to specify the name of the board-game
-        parser.add_argument('--boardcode', type=str, default='DG9TFMNR.txt', help='Sudoku board file name to solve [Default: DG9TFMNR.txt]')
-        
-        # Parsed args
-        return parser.parse_args()
-
-    
-    def print_info(verbose, verbose_level, iteration_level, BOARDCODE, FILENAME):
-        """
-        Prints the initial information about the Sudoku solver configuration.
-
-        Parameters
-        ----------
-        verbose : bool
-            Whether verbose output is enabled or not.
-        verbose_level : int
-            The verbosity level (1, 2, or 3).
-        iteration_level : int
-            The number of iterations between verbose outputs.
-        BOARDCODE : str
-            The name of the file containing the Sudoku board to solve.
-        FILENAME : str
-            The path to the file containing the Sudoku board.
-        """
-        # Print config info
-        print(f"\nBoard path: {FILENAME}")
-        print(f"Reading board: {BOARDCODE}")
-        if verbose:
-            print(f"Verbose: {verbose}")
-            print(f"Verbose Level: {verbose_level}")
-            print(f"Iteration Level: {iteration_level}")
-    
-    def print_board(board, verbose):
-        """
-        Prints the Sudoku board in a readable format.
-
-        Parameters
-        ----------
-        board : list of list of int
-            The current state of the Sudoku board.
-        verbose : bool
-            Whether verbose output is enabled or not (this is included for consistency with other methods).
-        """
-        # Iterates over the rows of the board and prints it legibly
-        for x in range(len(board)):
-            # Every 3 rows, print a blank line to separate the 3x3 subgrids
-            if x % 3 == 0 and x != 0:
-                print("               ")
-
-            # Create a row as a string, adding spaces between columns and a double space after every third value
-            row = [str(board[x][y]) + (' ' if y % 3 != 2 else '  ') for y in range(len(board[0]))]
-            # Print the joined row
-            print("".join(row))
-            
-   
+    The parser is built on the first call and reused afterwards.
 
+    Returns
+    -------
+    _Args
+        A namedtuple with the parsed arguments containing configuration parameters.
+    """
+    global _PARSER
+    if _PARSER is None:
+        _PARSER = _build_parser()
+
+    # Parsed args, frozen into a namedtuple with the same attribute names
+    args = _PARSER.parse_args()
+    return _Args(
+        verbose=args.verbose,
+        verbose_level=args.verbose_level,
+        iteration_level=args.iteration_level,
+        boardcode=args.boardcode,
+    )
+
+
+def print_info(verbose, verbose_level, iteration_level, BOARDCODE, FILENAME):
+    """
+    Prints the initial information about the Sudoku solver configuration.
+
+    Parameters
+    ----------
+    verbose : bool
+        Whether verbose output is enabled or not.
+    verbose_level : int
+        The verbosity level (1, 2, or 3).
+    iteration_level : int
+        The number of iterations between verbose outputs.
+    BOARDCODE : str
+        The name of the file containing the Sudoku board to solve.
+    FILENAME : str
+        The path to the file containing the Sudoku board.
+    """
+    # Print config info, with the verbose settings only when verbose output is enabled
+    info = f"\nBoard path: {FILENAME}\nReading board: {BOARDCODE}\n"
+    if verbose:
+        info += f"Verbose: {verbose}\nVerbose Level: {verbose_level}\nIteration Level: {iteration_level}\n"
+    sys.stdout.write(info)
+
+
+def _render_board(board):
+    """
+    Renders the Sudoku board as the text printed by `print_board`.
+
+    Parameters
+    ----------
+    board : list of list of int or np.ndarray
+        The current state of the Sudoku board.
+
+    Returns
+    -------
+    str
+        The 11 lines of the board (9 rows and 2 separators), each ending with a newline.
+    """
+    # A NumPy board is flattened to Python ints in a single call
+    if hasattr(board, "ravel"):
+        values = board.ravel().tolist()
+    else:
+        values = [value for row in board for value in row]
+
+    # Store the ASCII code of every digit in its place of a per-call copy of the template,
+    # so concurrent or nested renders never share a buffer
+    buf = bytearray(_BOARD_TEMPLATE)
+    for offset, value in zip(_CELL_OFFSETS, values):
+        buf[offset] = 48 + value
+    return buf.decode("ascii")
+
+
+def print_board(board):
+    """
+    Prints the Sudoku board in a readable format.
+
+    Parameters
+    ----------
+    board : list of list of int or np.ndarray
+        The current state of the Sudoku board.
+    """
+    sys.stdout.write(_render_board(board))
+
+
+def print_board_batch(boards):
+    """
+    Prints several Sudoku boards, separated by a blank line, with a single write.
+
+    Parameters
+    ----------
+    boards : iterable of list of list of int or np.ndarray
+        The Sudoku boards to print.
+    """
+    sys.stdout.write("\n".join(_render_board(board) for board in boards))
@@ -1,11 +1,11 @@
 from csp_sudokusolver import CSP_SudokuSolver
 from csp_sudokuconstraintchecker import CSP_SudokuConstraintChecker
-from csp_utils import CSP_utils
+from csp_utils import parse_args, print_info, print_board
 import numpy as np
 import os
 
 # Store compilation arguments.
-args = CSP_utils.parse_args()
+args = parse_args()
 
 # Compilation arguments
 verbose = args.verbose
@@ -19,7 +19,7 @@ FILENAME = os.path.join(base_dir, 'boards', BOARDCODE)
 
 
 # Print the compiling information
-CSP_utils.print_info(verbose,verbose_level, iteration_level,BOARDCODE, FILENAME)
+print_info(verbose,verbose_level, iteration_level,BOARDCODE, FILENAME)
 
 def main():
     """
@@ -41,7 +41,7 @@ def main():
     # Print the initial board if verbose mode is enabled
     if verbose:
         print("\nInitial board:\n")
-        CSP_utils.print_board(board, verbose)
+        print_board(board)
     
     # print("\nResolved Sudoku Board:")
     # print(final_board)
@@ -61,6 +61,9 @@ def main():
 def read_sudoku_from_file(filename):
     """
     Reads a Sudoku board from a specified file and converts it to a NumPy array.
+
+    The comma-separated file is parsed directly by `np.loadtxt`. Cell values only range
+    from 0 to 9, so the board is stored as `int8` to keep the whole 9x9 grid in 81 bytes.
     
     Parameters
     ----------
@@ -70,12 +73,10 @@ def read_sudoku_from_file(filename):
     Returns
     -------
     np.ndarray
-        The Sudoku board represented as a NumPy array.
+        The Sudoku board represented as a 9x9 NumPy array of `int8`.
     """
-    with open(filename) as file:
-        # Read each line, split by commas, and convert to integers
-        board = [list(map(int, line.strip().split(','))) for line in file]
-    return np.array(board)
+    # Parse the comma-separated rows straight into integers
+    return np.loadtxt(filename, delimiter=',', dtype=np.int8)
 
 
 def solve_sudoku(sudoku):
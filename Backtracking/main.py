@@ -1,6 +1,33 @@
-import copy
 import os
-from itertools import product, permutations
+from collections import deque
+from array import array
+
+# Mascara con los valores 1..9 disponibles (el bit v-1 representa al valor v)
+FULL_DOMAIN = 0x1FF
+
+# Tipos de las restricciones de fila, columna y caja; la unidad u es de tipo UNIT_TYPES[u // 9]
+UNIT_TYPES = ("row", "col", "box")
+
+# Suma minima y maxima de k valores distintos entre 1 y 9, indexadas por k
+TRI_MIN = (0, 1, 3, 6, 10, 15, 21, 28, 36, 45)
+TRI_MAX = (0, 9, 17, 24, 30, 35, 39, 42, 44, 45)
+
+
+def maskValues(mask):
+    """
+    Convierte una mascara de dominio en la lista ordenada de valores que representa.
+
+    Parametros
+    ----------
+    mask : int
+        Mascara de bits donde el bit v-1 esta activo si el valor v es posible.
+
+    Return
+    ------
+    values : list
+        Lista de valores del 1 al 9 contenidos en la mascara
+    """
+    return [value for value in range(1, 10) if mask >> (value - 1) & 1]
 
 
 class KillerSudokuSolver:
@@ -24,12 +51,47 @@ class KillerSudokuSolver:
     verbose : bool
         Si es True, activa salida detallada
         
-    board : list[list[int]]
-        Representación interna del tablero con los valores actuales de las celdas.
+    board : array
+        Representación interna del tablero con los valores actuales de las celdas,
+        guardada como un arreglo plano de 81 elementos indexado por fila * 9 + columna.
         
-    domains : dict
-        Diccionario que asocia a cada celda los valores posibles (dominio) que puede
-        tomar según las restricciones aplicadas.
+    domains : array
+        Arreglo plano de 81 elementos (indexado por fila * 9 + columna) con los valores
+        posibles (dominio) que puede tomar cada celda según las restricciones aplicadas,
+        codificados como una mascara de bits (el bit v-1 esta activo si el valor v es posible).
+
+    fixed : array
+        Valor predefinido de cada celda (0 si no tiene), interpretado una sola vez de la cuadricula.
+
+    cage_of : array
+        Posicion en `cage_ids` de la jaula de cada celda (-1 si no pertenece a ninguna).
+
+    cage_sum, cage_unassigned_count : array
+        Suma de los valores asignados y cantidad de celdas sin valor de cada jaula,
+        mantenidas al asignar y restaurar valores para no recalcularlas en cada pasada.
+
+    units : list
+        Indices planos de las celdas de las 27 unidades de fila (0..8), columna (9..17)
+        y caja (18..26). Es un atributo de clase, comun a todos los tableros.
+
+    cell_units : list
+        Unidades (fila, columna, caja y jaulas) que contienen a cada celda, usadas para
+        encolar solo las restricciones afectadas por un cambio.
+
+    cage_cells : dict
+        Diccionario que asocia a cada identificador de jaula la lista de indices planos
+        de sus celdas, calculado en una sola pasada por la cuadricula.
+
+    cell_to_cages : list
+        Lista que asocia a cada indice de celda los identificadores de las jaulas que la contienen.
+
+    by_popcount : list
+        Conjuntos de celdas sin valor indexados por el tamano de su dominio, mantenidos
+        al modificar el tablero para elegir la celda MRV sin recorrer todo el tablero.
+
+    trail : list
+        Pila de cambios (celda, dominio anterior, valor anterior) que permite deshacer
+        la propagacion de una rama al hacer backtracking sin copiar el tablero.
 
     Metodos:
     --------
@@ -40,7 +102,19 @@ class KillerSudokuSolver:
         Calcula los dominios iniciales para cada celda basandose en las restricciones.
 
     getCageCells(cage_id):
-        Encuentra las celdas asociadas a una jaula especifica.
+        Devuelve las celdas asociadas a una jaula especifica.
+
+    setDomain(cell, domain):
+        Reemplaza el dominio de una celda registrando el cambio en el trail.
+
+    setValue(cell, value):
+        Asigna un valor a una celda registrando el cambio en el trail.
+
+    undoTrail(trail_mark):
+        Deshace los cambios registrados en el trail desde la marca indicada.
+
+    enqueueCell(cell):
+        Agrega a la cola de propagacion las unidades que contienen a una celda.
 
     eliminateValues():
         Aplica propagación de restricciones para reducir los valores posibles en cada celda.
@@ -52,6 +126,21 @@ class KillerSudokuSolver:
         Método principal que utiliza backtracking y propagación de restricciones
         para resolver el tablero.
     """
+    # Indices de las celdas de las restricciones de fila, columna y caja (conjunto de celdas 3x3),
+    # numeradas como filas 0..8, columnas 9..17 y cajas 18..26
+    units = (
+        [[row * 9 + col for col in range(9)] for row in range(9)]
+        + [[row * 9 + col for row in range(9)] for col in range(9)]
+        + [
+            [
+                (3 * (box // 3) + r) * 9 + 3 * (box % 3) + c
+                for r in range(3)
+                for c in range(3)
+            ]
+            for box in range(9)
+        ]
+    )
+
     def __init__(self, grid, cages, verbose=False):
         """
         Inicializa la clase killerSudokuSolver
@@ -68,35 +157,87 @@ class KillerSudokuSolver:
         self.grid = grid
         self.cages = cages
         self.verbose = verbose
-        self.board = [[0 for _ in range(9)] for _ in range(9)]
+
+        # Interpretar cada celda de la cuadricula una sola vez: valor fijo (0 si no tiene)
+        # y jaula a la que pertenece (-1 si no pertenece a ninguna)
+        self.cage_ids = list(cages)
+        self.cage_index = {cage_id: i for i, cage_id in enumerate(self.cage_ids)}
+        self.fixed = array("B", [0] * 81)
+        self.cage_of = array("b", [-1] * 81)
+        for row in range(9):
+            for col in range(9):
+                cell = grid[row][col]
+                # Caso donde la celda tiene un valor predefinido (por seguridad en algun tipo de tablero)
+                if cell != "0" and not cell.startswith("."):
+                    self.fixed[row * 9 + col] = int(cell[0])
+                if "C" in cell:
+                    cage_id = cell[cell.index("C"):]
+                    if cage_id not in self.cage_index:
+                        self.cage_index[cage_id] = len(self.cage_ids)
+                        self.cage_ids.append(cage_id)
+                    self.cage_of[row * 9 + col] = self.cage_index[cage_id]
+
+        # Tablero y dominios como arreglos planos, la celda (fila, columna) esta en fila * 9 + columna
+        self.board = array("H", [0] * 81)
         self.domains = self.initializeDomains()
 
+        # Agrupar las celdas de cada jaula a partir de la jaula ya interpretada de cada celda
+        self.cage_cells = {cage_id: [] for cage_id in self.cage_ids}
+        self.cell_to_cages = [[] for _ in range(81)]
+        for cell in range(81):
+            if self.cage_of[cell] >= 0:
+                cage_id = self.cage_ids[self.cage_of[cell]]
+                self.cage_cells[cage_id].append(cell)
+                self.cell_to_cages[cell].append(cage_id)
+
+        # Suma de los valores asignados y cantidad de celdas libres de cada jaula (por posicion
+        # en cage_ids), actualizadas al asignar o restaurar un valor
+        self.cage_sum = array("H", [0] * len(self.cage_ids))
+        self.cage_unassigned_count = array("B", [len(self.cage_cells[cage_id]) for cage_id in self.cage_ids])
+
+        # Unidades (fila, columna, caja y jaulas) que contienen a cada celda
+        self.cell_units = [
+            (cell // 9, 9 + cell % 9, 18 + 3 * (cell // 27) + (cell % 9) // 3)
+            + tuple(cage_id for cage_id in self.cell_to_cages[cell] if cage_id in cages)
+            for cell in range(81)
+        ]
+
+        # Combinaciones validas ya calculadas, indexadas por (suma restante, dominios de las celdas)
+        self._combo_cache = {}
+        # Cola de unidades pendientes de revisar: al inicio se revisan todas
+        self._queue = deque(range(27))
+        self._queue.extend(cages)
+        self._queued = set(self._queue)
+
+        self.trail = []
+
+        # Celdas sin valor agrupadas por la cantidad de valores de su dominio (indice 0..9)
+        self.by_popcount = [set() for _ in range(10)]
+        for cell in range(81):
+            self.by_popcount[self.domains[cell].bit_count()].add(cell)
+
     def initializeDomains(self):
         """
         Inicialisa los dominios para cada celda teniendo en cuenta las restricciones
 
         Return
         ------
-        domains : dict
-            Diccionario que contiene los posibles valores para cada celda.
-            Las claves son coordenadas (fila, columna) y los valores son listas
-            con los números posibles en esa celda.
+        domains : array
+            Arreglo plano de 81 elementos, indexado por fila * 9 + columna, con la
+            mascara de bits de los números posibles en cada celda.
         """
-        domains = {}
+        domains = array("H", [FULL_DOMAIN] * 81)
         if self.verbose:
             print("\nInicializando dominios para cada celda...")
 
         # Recorrer cada celda del tablero
-        for row in range(9):
-            for col in range(9):
-                # Caso donde la celda tiene un valor predefinido (por seguridad en algun tipo de tablero)
-                if self.grid[row][col] != "0" and not self.grid[row][col].startswith("."):
-                    domains[(row, col)] = [int(self.grid[row][col][0])]
-                else:
-                    # La celda puede tomar cualquier valor del dominio
-                    domains[(row, col)] = list(range(1, 10))
-                    if self.verbose:
-                        print(f"Celda ({row}, {col}) tiene dominio completo: {domains[(row, col)]}")
+        for cell in range(81):
+            if self.fixed[cell]:
+                domains[cell] = 1 << (self.fixed[cell] - 1)
+            else:
+                # La celda puede tomar cualquier valor del dominio
+                if self.verbose:
+                    print(f"Celda {divmod(cell, 9)} tiene dominio completo: {maskValues(domains[cell])}")
         if self.verbose:
             print("Dominios inicializados.\n")
         
@@ -104,7 +245,10 @@ class KillerSudokuSolver:
 
     def getCageCells(self, cage_id):
         """
-        Encuentra todas las celdas que pertenecen a una jaula específica del tablero.
+        Devuelve todas las celdas que pertenecen a una jaula específica del tablero.
+
+        Las celdas de cada jaula se agrupan una sola vez al crear el solver, por lo que
+        esta funcion solo consulta `self.cage_cells` en lugar de recorrer el tablero.
 
         Parametros
         ----------
@@ -114,24 +258,88 @@ class KillerSudokuSolver:
         Return
         ------
         cage_cells : list
-            Lista de coordenadas de las celdas que pertenecen a la jaula especificada.
+            Lista de indices planos de las celdas que pertenecen a la jaula especificada.
         """
-        if self.verbose:
-            print(f"Buscando celdas para la jaula: {cage_id}...")
-
-        # Lista que recorre todas las celdas del tablero 9x9 e identifica a las celdas
-        # que pertenecen a la jaula `cage_id` 
-        cage_cells = [
-            (row, col)
-            for row in range(9)
-            for col in range(9)
-            if self.grid[row][col].endswith(cage_id)
-        ]
+        return self.cage_cells.get(cage_id, [])
 
-        if self.verbose:
-            print(f"Se encontraron {len(cage_cells)} celdas para la jaula: {cage_id}.\n")
+    def setDomain(self, cell, domain):
+        """
+        Reemplaza el dominio de una celda, guardando en el trail su estado anterior
+        para poder restaurarlo al hacer backtracking.
+
+        Parametros
+        ----------
+        cell : int
+            Indice plano (fila * 9 + columna) de la celda
+        domain : int
+            Nueva mascara de bits con los valores posibles de la celda
+        """
+        self.trail.append((cell, self.domains[cell], self.board[cell]))
+        if self.board[cell] == 0:
+            self.by_popcount[self.domains[cell].bit_count()].discard(cell)
+            self.by_popcount[domain.bit_count()].add(cell)
+        self.domains[cell] = domain
 
-        return cage_cells
+    def setValue(self, cell, value):
+        """
+        Asigna un valor a una celda del tablero, guardando en el trail su estado anterior
+        para poder restaurarlo al hacer backtracking.
+
+        Parametros
+        ----------
+        cell : int
+            Indice plano (fila * 9 + columna) de la celda
+        value : int
+            Valor asignado a la celda
+        """
+        self.trail.append((cell, self.domains[cell], self.board[cell]))
+        if self.board[cell] == 0:
+            self.by_popcount[self.domains[cell].bit_count()].discard(cell)
+            if self.cage_of[cell] >= 0:
+                self.cage_sum[self.cage_of[cell]] += value
+                self.cage_unassigned_count[self.cage_of[cell]] -= 1
+        self.board[cell] = value
+
+    def undoTrail(self, trail_mark):
+        """
+        Deshace, en orden inverso, todos los cambios registrados en el trail
+        despues de la marca indicada.
+
+        Parametros
+        ----------
+        trail_mark : int
+            Longitud que tenia el trail antes de los cambios a deshacer
+        """
+        while len(self.trail) > trail_mark:
+            cell, domain, value = self.trail.pop()
+            if self.board[cell] == 0:
+                self.by_popcount[self.domains[cell].bit_count()].discard(cell)
+            if value == 0:
+                self.by_popcount[domain.bit_count()].add(cell)
+                if self.board[cell] != 0 and self.cage_of[cell] >= 0:
+                    self.cage_sum[self.cage_of[cell]] -= self.board[cell]
+                    self.cage_unassigned_count[self.cage_of[cell]] += 1
+            self.domains[cell] = domain
+            self.board[cell] = value
+
+        # El estado restaurado ya era consistente, las unidades pendientes se descartan
+        self._queue.clear()
+        self._queued.clear()
+
+    def enqueueCell(self, cell):
+        """
+        Agrega a la cola de propagacion las unidades (fila, columna, caja y jaulas) que
+        contienen a una celda cuyo dominio o valor cambio.
+
+        Parametros
+        ----------
+        cell : int
+            Indice plano (fila * 9 + columna) de la celda
+        """
+        for unit in self.cell_units[cell]:
+            if unit not in self._queued:
+                self._queued.add(unit)
+                self._queue.append(unit)
 
     def eliminateValues(self):
         """
@@ -147,151 +355,233 @@ class KillerSudokuSolver:
         bool
             True si la propagacion fue exitosa, False si se encuentra alguna contradiccion
         """
-        changed = True # sirve para seguir iterando mientras haya cambios
-        while changed:
-            changed = False
-
-            # Reestricciones de fila columna y caja (conjunto de celdas 3x3 del tablero)
-            for constraint_type in ["row", "col", "box"]:
+        queue = self._queue
+        while queue:
+            unit = queue.popleft()
+            self._queued.discard(unit)
+
+            if unit not in self.cages:
+                # Reestricciones de fila columna y caja (conjunto de celdas 3x3 del tablero)
+                cells = self.units[unit]
                 if self.verbose:
-                    print(f"Procesando restricciones para: {constraint_type}")
-
-                # Conjunto de celdas segun el tipod de restriccion
-                if constraint_type == "row":
-                    constraints = [[(i, col) for col in range(9)] for i in range(9)]
-
-                elif constraint_type == "col":
-                    constraints = [[(row, i) for row in range(9)] for i in range(9)]
-
-                else:  # box
-                    constraints = [
-                        [
-                            (3 * (box // 3) + r, 3 * (box % 3) + c)
-                            for r in range(3)
-                            for c in range(3)
-                        ]
-                        for box in range(9)
-                    ]
-                    
-                    
-                # Plicar restricciones dentro de cada conjunto
-                for cells in constraints:
-                    # Obtener los valores actuales de estas celdas
-                    values = [self.board[row][col] for row, col in cells]
-
-                    # Elimina los valores que ya se estan usando en este conjunto de restricciones
-                    used_values = set(v for v in values if v != 0)
-
-                    for row, col in cells:
-                        if self.board[row][col] == 0: # si la celda no tiene valor asignado
-                            old_domain = self.domains[(row, col)].copy()
-                            # Reducir el dominio eliminando valores ya utilizados
-                            self.domains[(row, col)] = [
-                                val
-                                for val in self.domains[(row, col)]
-                                if val not in used_values
-                            ]
-                            if self.verbose and self.domains[(row, col)] != old_domain:
+                    print(f"Procesando restricciones para: {UNIT_TYPES[unit // 9]} {unit % 9}")
+
+                # Mascara de los valores que ya se estan usando en este conjunto de restricciones
+                used_mask = 0
+                for cell in cells:
+                    if self.board[cell] != 0:
+                        bit = 1 << (self.board[cell] - 1)
+                        # Un valor repetido dentro del conjunto es una contradiccion
+                        if used_mask & bit:
+                            return False
+                        used_mask |= bit
+
+                for cell in cells:
+                    if self.board[cell] == 0: # si la celda no tiene valor asignado
+                        old_domain = self.domains[cell]
+                        # Reducir el dominio eliminando valores ya utilizados
+                        domain = old_domain & ~used_mask
+                        if domain != old_domain:
+                            self.setDomain(cell, domain)
+                            self.enqueueCell(cell)
+                            if self.verbose:
                                 print(
-                                    f"Dominio de la celda ({row}, {col}) reducido: {old_domain} -> {self.domains[(row, col)]}"
+                                    f"Dominio de la celda {divmod(cell, 9)} reducido: {maskValues(old_domain)} -> {maskValues(domain)}"
                                 )
-                            # caso donde queda un unico valor dentro del dominio
-                            if len(self.domains[(row, col)]) == 1:
-                                self.board[row][col] = self.domains[(row, col)][0]
-                                changed = True
-                                if self.verbose:
-                                    print(
-                                        f"Tomando valor {self.board[row][col]} en la celda ({row}, {col})"
-                                    )
-
-                            # Caso donde no quedan valores en el dominio (contradiccion)
-                            if len(self.domains[(row, col)]) == 0:
+                        # caso donde queda un unico valor dentro del dominio
+                        if domain.bit_count() == 1:
+                            self.setValue(cell, domain.bit_length())
+                            self.enqueueCell(cell)
+                            if self.verbose:
+                                print(
+                                    f"Tomando valor {self.board[cell]} en la celda {divmod(cell, 9)}"
+                                )
+
+                        # Caso donde no quedan valores en el dominio (contradiccion)
+                        if domain == 0:
+                            return False
+
+                # Valores ocultos: los que solo caben en una celda del conjunto.
+                # once acumula los valores vistos y more los vistos en mas de una celda
+                once = 0
+                more = 0
+                for cell in cells:
+                    value = self.board[cell]
+                    domain = 1 << (value - 1) if value else self.domains[cell]
+                    more |= once & domain
+                    once |= domain
+
+                # Algun valor no cabe en ninguna celda del conjunto (contradiccion)
+                if once != FULL_DOMAIN:
+                    return False
+
+                hidden = once & ~more
+                if hidden:
+                    for cell in cells:
+                        if self.board[cell] == 0 and self.domains[cell] & hidden:
+                            domain = self.domains[cell] & hidden
+                            # Una celda no puede ser la unica posicion de dos valores
+                            if domain.bit_count() > 1:
                                 return False
+                            self.setDomain(cell, domain)
+                            self.setValue(cell, domain.bit_length())
+                            self.enqueueCell(cell)
+                            if self.verbose:
+                                print(
+                                    f"Valor oculto {self.board[cell]} en la celda {divmod(cell, 9)}"
+                                )
+
+                # Candidatos bloqueados: un valor que dentro de una caja solo cabe en una fila
+                # (o columna) se elimina del resto de esa fila (o columna) fuera de la caja
+                if unit >= 18:
+                    row_masks = [0, 0, 0]
+                    col_masks = [0, 0, 0]
+                    for k, cell in enumerate(cells):
+                        value = self.board[cell]
+                        domain = 1 << (value - 1) if value else self.domains[cell]
+                        row_masks[k // 3] |= domain
+                        col_masks[k % 3] |= domain
+
+                    box_row = 3 * ((unit - 18) // 3)
+                    box_col = 3 * ((unit - 18) % 3)
+                    for masks, first_line in ((row_masks, box_row), (col_masks, 9 + box_col)):
+                        for k in range(3):
+                            locked = masks[k] & ~(masks[k - 1] | masks[k - 2])
+                            if not locked:
+                                continue
+
+                            for cell in self.units[first_line + k]:
+                                if (self.board[cell] == 0 and self.domains[cell] & locked
+                                        and self.cell_units[cell][2] != unit):
+                                    domain = self.domains[cell] & ~locked
+                                    if domain == 0:
+                                        return False
+                                    self.setDomain(cell, domain)
+                                    self.enqueueCell(cell)
+                                    if self.verbose:
+                                        print(
+                                            f"Candidatos bloqueados {maskValues(locked)} eliminados de la celda {divmod(cell, 9)}"
+                                        )
+                continue
 
             # ------------------------------------------------------------------------------------
             # Restricciones de las jaulas
-            for cage_id, target_sum in self.cages.items():
+            # Una jaula solo vuelve a la cola cuando alguna de sus celdas se modifica
+            cage_id, target_sum = unit, self.cages[unit]
 
-                if self.verbose:
-                    print(
-                        f"\nProcesando restricciones para la jaula: {cage_id} con suma objetivo: {target_sum}"
-                    )
+            if self.verbose:
+                print(
+                    f"\nProcesando restricciones para la jaula: {cage_id} con suma objetivo: {target_sum}"
+                )
+
+            cage_idx = self.cage_index[cage_id]
+            unassigned_count = self.cage_unassigned_count[cage_idx]
+            remaining_sum = target_sum - self.cage_sum[cage_idx]
 
-                cage_cells = self.getCageCells(cage_id)
-                cage_values = [self.board[row][col] for row, col in cage_cells]
+            # Si todas las celdas dentro de una jaula ya tienen valores asignados se verifica
+            # que se cumpla la suma objetivo de a jaula
+            if unassigned_count == 0 and remaining_sum != 0:
+                return False
 
+            # Podar los dominios para las celdas de la jaula
+            if unassigned_count:
                 # Filtrar el valores o valores asignados
                 unassigned_cells = [
-                    cell for cell in cage_cells if self.board[cell[0]][cell[1]] == 0
+                    cell for cell in self.cage_cells[cage_id] if self.board[cell] == 0
                 ]
 
-                # Si todas las celdas dentro de una jaula ya tienen valores asignados se verifica
-                # que se cumpla la suma objetivo de a jaula
-                if len(unassigned_cells) == 0 and sum(cage_values) != target_sum:
-                    return False
+                # Con una sola celda libre, su valor es directamente la suma restante
+                if unassigned_count == 1:
+                    cell = unassigned_cells[0]
+                    if not 1 <= remaining_sum <= 9 or not self.domains[cell] >> (remaining_sum - 1) & 1:
+                        return False
+                    if self.domains[cell] != 1 << (remaining_sum - 1):
+                        self.setDomain(cell, 1 << (remaining_sum - 1))
+                    self.setValue(cell, remaining_sum)
+                    self.enqueueCell(cell)
+                    if self.verbose:
+                        print(
+                            f"Tomando valor {remaining_sum} en la celda {divmod(cell, 9)}"
+                        )
+                    continue
 
-                # Podar los dominios para las celdas de la jaula
-                if unassigned_cells:
-                    # Encontrar las combinaciones válidas para celdas no asignadas
-                    current_sum = sum(cage_values)
-                    remaining_sum = target_sum - current_sum
+                # Descartar sumas restantes imposibles antes de enumerar combinaciones: primero
+                # con los limites de k valores distintos y luego con los valores de los dominios
+                if not TRI_MIN[unassigned_count] <= remaining_sum <= TRI_MAX[unassigned_count]:
+                    return False
+                union_mask = 0
+                for cell in unassigned_cells:
+                    union_mask |= self.domains[cell]
+                available = maskValues(union_mask)
+                if (len(available) < unassigned_count
+                        or sum(available[:unassigned_count]) > remaining_sum
+                        or sum(available[-unassigned_count:]) < remaining_sum):
+                    return False
 
-                    # Generar posibles combinaciones
+                # Generar posibles combinaciones, reutilizando las ya calculadas
+                # para la misma suma restante y los mismos dominios
+                domain_masks = tuple(self.domains[cell] for cell in unassigned_cells)
+                cache_key = (remaining_sum, domain_masks)
+                valid_combinations = self._combo_cache.get(cache_key)
+                if valid_combinations is None:
                     valid_combinations = self.genValidCombinations(
                         unassigned_cells,
                         remaining_sum,
-                        [self.domains[cell] for cell in unassigned_cells],
+                        list(domain_masks),
                     )
+                    self._combo_cache[cache_key] = valid_combinations
 
-                    # Contradiccion
-                    if not valid_combinations:
-                        return False
+                # Contradiccion
+                if not valid_combinations:
+                    return False
 
-                    # Actualizar (reducir) dominio basandose en las combinaciones asignadas
-                    for cell in unassigned_cells:
-                        possible_values = set(
-                            val for combo in valid_combinations for val in combo
-                        )
-                        new_domain = [
-                            val for val in self.domains[cell] if val in possible_values
-                        ]
+                # Mascara de los valores que aparecen en alguna combinacion valida
+                possible_mask = 0
+                for combo in valid_combinations:
+                    for val in combo:
+                        possible_mask |= 1 << (val - 1)
 
-                        
-                        if not new_domain:
-                            return False
+                # Actualizar (reducir) dominio basandose en las combinaciones asignadas
+                for cell in unassigned_cells:
+                    new_domain = self.domains[cell] & possible_mask
+
+                    if not new_domain:
+                        return False
 
-                        if len(new_domain) < len(self.domains[cell]):
-                            self.domains[cell] = new_domain
-                            changed = True
+                    if new_domain != self.domains[cell]:
+                        self.setDomain(cell, new_domain)
+                        self.enqueueCell(cell)
+                        if self.verbose:
+                            print(
+                                f"Reducción del dominio para la celda {divmod(cell, 9)} a {maskValues(new_domain)}"
+                            )
+
+                        # Si solo queda un valor, se asigna a la celda
+                        if new_domain.bit_count() == 1:
+                            self.setValue(cell, new_domain.bit_length())
                             if self.verbose:
                                 print(
-                                    f"Reducción del dominio para la celda {cell} a {new_domain}"
+                                    f"Tomando valor {self.board[cell]} en la celda {divmod(cell, 9)}"
                                 )
 
-                            # Si solo queda un valor, se asigna a la celda
-                            if len(new_domain) == 1:
-                                row, col = cell
-                                self.board[row][col] = new_domain[0]
-                                changed = True
-                                if self.verbose:
-                                    print(
-                                        f"Tomando valor {self.board[row][col]} en la celda ({row}, {col})"
-                                    )
-
         return True
 
     def genValidCombinations(self, cells, target_sum, domains):
         """
         Generar las combinaciones de valores validas para celdas de las jaulas no asignadas.
 
+        Las combinaciones se construyen con una busqueda en profundidad que asigna a cada
+        celda solo valores de su dominio aun no usados, y poda la rama en cuanto la suma
+        objetivo queda fuera del rango alcanzable con las celdas restantes.
+
         Parametros
         ----------
         cells : list
-            celdas sin asignar de la jaula
+            indices planos de las celdas sin asignar de la jaula
         target_sum :  int
             Suma objetivo de la jaula
         domains : list
-            Lista de listas, donde cada sublista representa los posibles valores de cada celda.
+            Lista de mascaras de bits, donde cada una representa los posibles valores de cada celda.
 
 
         Return
@@ -303,16 +593,41 @@ class KillerSudokuSolver:
 
         if self.verbose:
             print(
-                f"Generando combinaciones válidas para las celdas {cells} con suma objetivo {target_sum}..."
+                f"Generando combinaciones válidas para las celdas {[divmod(cell, 9) for cell in cells]} con suma objetivo {target_sum}..."
             )
 
-        # producto cartesiano de los valores posibles de cada celda
-        for combo in product(*domains):
-            if (
-                len(set(combo)) == len(combo)  # Todos los valores unicos
-                and sum(combo) == target_sum   # Suma valida
-            ):
-                valid_combinations.append(combo)
+        # Union de los dominios de las celdas que quedan a partir de cada posicion
+        n = len(domains)
+        remaining_union = [0] * (n + 1)
+        for i in range(n - 1, -1, -1):
+            remaining_union[i] = remaining_union[i + 1] | domains[i]
+
+        def search(i, used_mask, current_sum, combo):
+            # Todas las celdas tienen valor, se verifica la suma
+            if i == n:
+                if current_sum == target_sum:
+                    valid_combinations.append(combo)
+                return
+
+            # Cotas de la suma: los k valores distintos mas pequenos y mas grandes
+            # que todavia pueden tomar las k celdas restantes
+            remaining = n - i
+            available = maskValues(remaining_union[i] & ~used_mask)
+            if len(available) < remaining:
+                return
+            if (current_sum + sum(available[:remaining]) > target_sum
+                    or current_sum + sum(available[-remaining:]) < target_sum):
+                return
+
+            # Probar cada valor del dominio de la celda que no se haya usado
+            mask = domains[i] & ~used_mask
+            while mask:
+                bit = mask & -mask
+                value = bit.bit_length()
+                search(i + 1, used_mask | bit, current_sum + value, combo + (value,))
+                mask ^= bit
+
+        search(0, 0, 0, ())
 
         if self.verbose:
             print(f"{len(valid_combinations)} combinaciones válidas encontradas.")
@@ -340,35 +655,29 @@ class KillerSudokuSolver:
             return None
 
         # Revisar si el tablero esta completamente resulto
-        if all(all(cell != 0 for cell in row) for row in self.board):
+        if 0 not in self.board:
             if self.verbose:
                 print("El tablero está completamente resuelto.")
-            return self.board
+            return [self.board[row * 9:row * 9 + 9].tolist() for row in range(9)]
 
         # heuristica MRV (minimum remaining value)
-        # Encontrar la celda con el dominio mas pequeno
-        min_domain_cell = min(
-            (
-                (row, col)
-                for row in range(9)
-                for col in range(9)
-                if self.board[row][col] == 0
-            ),
-            # Definimos una funcion anonima que toma como argumento a las cordenadas de una celda del
-            # tablero y recupera el dominio de la celda en un diccionario
-            key=lambda cell: len(self.domains[cell]),
-        )
-
-        row, col = min_domain_cell
+        # Encontrar la celda con el dominio mas pequeno en el primer grupo no vacio,
+        # desempatando por el menor indice como el recorrido original del tablero
+        for bucket in self.by_popcount[1:]:
+            if bucket:
+                min_domain_cell = min(bucket)
+                break
+
+        row, col = divmod(min_domain_cell, 9)
 
         # Intentar todos los valores posibles para la celda actual
-        for value in self.domains[(row, col)]:
-            # Crear una copia del estado actual para realizar backtraking
-            board_copy = copy.deepcopy(self.board)
-            domains_copy = copy.deepcopy(self.domains)
+        for value in maskValues(self.domains[min_domain_cell]):
+            # Marcar el estado actual del trail para realizar backtraking
+            trail_mark = len(self.trail)
 
             # Asignamos el valor temporalmente a la celda
-            self.board[row][col] = value
+            self.setValue(min_domain_cell, value)
+            self.enqueueCell(min_domain_cell)
 
             # Resolucion recursiva con propagacion de restricciones.
             if self.eliminateValues():
@@ -377,8 +686,7 @@ class KillerSudokuSolver:
                     return solution
 
             # Backtrack
-            self.board = board_copy
-            self.domains = domains_copy
+            self.undoTrail(trail_mark)
 
             if self.verbose:
                 print(